@@ -3,11 +3,11 @@ import os
 import subprocess
 import base64
 import json
+import threading
 import time
 import logging
 from pathlib import Path
 
-import clipboard
 from PyQt5.QtWidgets import (QApplication, QMessageBox, QInputDialog, QLineEdit, QProgressBar,
                               QLabel, QVBoxLayout, QWidget)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
@@ -105,13 +105,24 @@ def find_engine_binary():
 
 # --- GUI Components ---
 
+_app_icon = None
+
+
+def get_app_icon():
+    """Return the shared window icon, decoding the .ico file only once."""
+    global _app_icon
+    if _app_icon is None and os.path.exists(icon_path):
+        _app_icon = QIcon(icon_path)
+    return _app_icon
+
 class ProgressDialog(QWidget):
     def __init__(self, title="Processing"):
         super().__init__()
         self.setWindowTitle(title)
         self.setWindowFlag(Qt.WindowStaysOnTopHint)
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
+        icon = get_app_icon()
+        if icon is not None:
+            self.setWindowIcon(icon)
 
         layout = QVBoxLayout()
 
@@ -145,8 +156,9 @@ def show_error_popup(message):
         msg.setIcon(QMessageBox.Critical)
         msg.setText(message)
         msg.setWindowTitle("Study Aggregator - Error")
-        if os.path.exists(icon_path):
-            msg.setWindowIcon(QIcon(icon_path))
+        icon = get_app_icon()
+        if icon is not None:
+            msg.setWindowIcon(icon)
         msg.setWindowFlag(Qt.WindowStaysOnTopHint)
         msg.exec_()
     except Exception as e:
@@ -161,8 +173,9 @@ def show_success_popup(message):
         msg.setIcon(QMessageBox.Information)
         msg.setText(message)
         msg.setWindowTitle("Study Aggregator - Success")
-        if os.path.exists(icon_path):
-            msg.setWindowIcon(QIcon(icon_path))
+        icon = get_app_icon()
+        if icon is not None:
+            msg.setWindowIcon(icon)
         msg.setWindowFlag(Qt.WindowStaysOnTopHint)
         msg.exec_()
     except Exception as e:
@@ -184,6 +197,11 @@ class ProcessingThread(QThread):
         self.engine_path = engine_path
         self.progress_dialog = progress_dialog
         self._password_b64 = None
+        self._last_progress_emit = 0.0
+        # Password handshake: the GUI slot stores the value and sets the
+        # event; the worker blocks on the event instead of polling.
+        self._pw_event = threading.Event()
+        self._pw_value = None
 
     def run(self):
         try:
@@ -241,43 +259,48 @@ class ProcessingThread(QThread):
                 if msg_type == 'progress':
                     pct = msg.get('percent', 0)
                     text = msg.get('message', '')
-                    self.progress_updated.emit(max(0, pct), text)
+                    # Throttle to ~20 Hz: the engine can emit thousands of
+                    # progress lines and each emit queues a cross-thread Qt
+                    # event, starving the GUI thread of repaint time.
+                    now = time.monotonic()
+                    if pct >= 100 or now - self._last_progress_emit >= 0.05:
+                        self._last_progress_emit = now
+                        self.progress_updated.emit(max(0, pct), text)
 
                 elif msg_type == 'password_needed':
                     self.progress_updated.emit(-1, "Password")
-                    wait_start = time.time()
-                    while not hasattr(self, '_password_received') and (time.time() - wait_start < 600):
-                        time.sleep(0.1)
-
-                    if hasattr(self, '_password_received'):
-                        pw_bytes = self._password_received
-                        del self._password_received
-
-                        if pw_bytes is None:
-                            self.error_signal.emit("Password input cancelled.")
-                            process.kill()
-                            stdout_thread.join(timeout=2)
-                            return
-
+                    if not self._pw_event.wait(timeout=600):
+                        self.error_signal.emit("Password input timed out.")
                         process.kill()
-                        process.wait()
                         stdout_thread.join(timeout=2)
-                        pw_b64 = base64.b64encode(pw_bytes).decode('ascii')
-                        self._run_engine(password_b64=pw_b64)
                         return
-                    else:
-                        self.error_signal.emit("Password input timed out.")
+
+                    self._pw_event.clear()
+                    pw_bytes = self._pw_value
+                    self._pw_value = None
+
+                    if pw_bytes is None:
+                        self.error_signal.emit("Password input cancelled.")
                         process.kill()
                         stdout_thread.join(timeout=2)
                         return
 
+                    process.kill()
+                    process.wait()
+                    stdout_thread.join(timeout=2)
+                    pw_b64 = base64.b64encode(pw_bytes).decode('ascii')
+                    self._run_engine(password_b64=pw_b64)
+                    return
+
                 elif msg_type == 'error':
                     err_msg = msg.get('message', 'Unknown engine error')
                     logging.error(f"Engine error: {err_msg}")
                     engine_errors.append(err_msg)
 
             except json.JSONDecodeError:
-                logging.debug(f"Engine stderr: {line}")
+                # %-style so the string is only built when DEBUG is on —
+                # this runs for every non-JSON stderr line.
+                logging.debug("Engine stderr: %s", line)
 
         stdout_thread.join(timeout=30)
         stdout_data = b''.join(stdout_chunks)
@@ -285,13 +308,10 @@ class ProcessingThread(QThread):
 
         if exit_code == 2 and not password_b64:
             self.progress_updated.emit(-1, "Password")
-            wait_start = time.time()
-            while not hasattr(self, '_password_received') and (time.time() - wait_start < 600):
-                time.sleep(0.1)
-
-            if hasattr(self, '_password_received'):
-                pw_bytes = self._password_received
-                del self._password_received
+            if self._pw_event.wait(timeout=600):
+                self._pw_event.clear()
+                pw_bytes = self._pw_value
+                self._pw_value = None
                 if pw_bytes:
                     pw_b64 = base64.b64encode(pw_bytes).decode('ascii')
                     self._run_engine(password_b64=pw_b64)
@@ -332,10 +352,6 @@ class ProcessingThread(QThread):
             )
             return
 
-        for patient in patients.values():
-            for study in patient.get('studies', {}).values():
-                study['all_series'] = set(study.get('all_series', []))
-
         self.finished_signal.emit(patients)
 
 
@@ -480,7 +496,8 @@ def main_app_logic():
                                 progress_dialog,
                                 "any password-protected ZIP files in the directory"
                             )
-                        processing_thread._password_received = pw
+                        processing_thread._pw_value = pw
+                        processing_thread._pw_event.set()
                     finally:
                         progress_dialog.show()
                 else:
@@ -493,7 +510,7 @@ def main_app_logic():
         processing_thread.set_normal.connect(lambda: app.restoreOverrideCursor())
 
         def on_finished_slot(merged_patients):
-            logging.debug(f"Received {len(merged_patients)} patients from engine")
+            logging.debug("Received %d patients from engine", len(merged_patients))
             try:
                 progress_dialog.update_progress(100, "Processing complete. Formatting results...")
 
@@ -507,47 +524,51 @@ def main_app_logic():
                     return
 
                 def sort_patients(patient_data):
+                    # Called once per patient by sorted(); keep it minimal.
                     pid = patient_data.get('patient_id') or 'ZZZZ'
                     name = patient_data.get('patient_name', 'Unknown')
-                    pid_val = pid.zfill(10) if pid.isdigit() else str(pid) if pid else 'ZZZZ'
-                    return (pid_val, name.lower())
+                    return (pid.zfill(10) if pid.isdigit() else pid, name.lower())
 
                 sorted_patients = sorted(merged_patients.values(), key=sort_patients)
-                lines = []
-
-                for patient in sorted_patients:
-                    pid = patient.get('patient_id', '')
-                    name = patient.get('patient_name', 'Unknown')
-                    dob = patient.get('patient_dob', 'Unknown')
-
-                    display_name = f"NAME: {name} DOB: {dob}, ID: {pid or 'Unknown'}"
-                    lines.extend([f"{display_name}\r\n", "STUDIES\r\n\r\n"])
-
-                    studies_dict = patient.get('studies', {})
-                    if isinstance(studies_dict, dict) and studies_dict:
-                        sorted_studies = sorted(
-                            studies_dict.values(),
-                            key=lambda x: (x.get('study_date', 'Unknown'), x.get('study_description', ''))
-                        )
-                        for study in sorted_studies:
-                            study_date = study.get('study_date', 'Unknown')
-                            study_desc = study.get('study_description', 'Unknown')
-                            all_series = study.get('all_series', set())
-                            series_count = len(all_series)
-                            if series_count > 0:
-                                lines.append(f"{study_date} {study_desc} ({series_count} series)\r\n")
-                            else:
-                                lines.append(f"{study_date} {study_desc}\r\n")
+                separator = "\r\n" + "=" * 50 + "\r\n\r\n"
+
+                def render_lines(patients):
+                    # Generator feeding a single join: no intermediate line
+                    # list to grow, every yield is a fully rendered string.
+                    for patient in patients:
+                        pid = patient.get('patient_id', '')
+                        name = patient.get('patient_name', 'Unknown')
+                        dob = patient.get('patient_dob', 'Unknown')
+
+                        yield f"NAME: {name} DOB: {dob}, ID: {pid or 'Unknown'}\r\n"
+                        yield "STUDIES\r\n\r\n"
+
+                        studies_dict = patient.get('studies', {})
+                        if isinstance(studies_dict, dict) and studies_dict:
+                            sorted_studies = sorted(
+                                studies_dict.values(),
+                                key=lambda x: (x.get('study_date', 'Unknown'), x.get('study_description', ''))
+                            )
+                            for study in sorted_studies:
+                                study_date = study.get('study_date', 'Unknown')
+                                study_desc = study.get('study_description', 'Unknown')
+                                series_count = study.get('series_count', 0)
+                                if series_count > 0:
+                                    yield f"{study_date} {study_desc} ({series_count} series)\r\n"
+                                else:
+                                    yield f"{study_date} {study_desc}\r\n"
 
-                    lines.append("\r\n" + "=" * 50 + "\r\n\r\n")
+                        yield separator
 
-                output_text = "".join(lines) if lines else None
+                output_text = "".join(render_lines(sorted_patients))
 
                 progress_dialog.close()
 
                 if output_text:
                     try:
-                        clipboard.copy(output_text)
+                        # Qt's clipboard is in-process; no helper subprocess
+                        # or extra copy of the output string.
+                        QApplication.clipboard().setText(output_text)
                         show_success_popup(
                             "DICOM study information has been copied to your clipboard."
                         )
@@ -22,8 +22,10 @@ const INSTITUTION_NAME: u32 = 0x0008_0080;
 const INSTITUTION_ADDRESS: u32 = 0x0008_0081;
 const INSTITUTIONAL_DEPT_NAME: u32 = 0x0008_1040;
 
-// Pixel data tag — stop parsing when we hit this
-const PIXEL_DATA: u32 = 0x7FE0_0010;
+// Highest group containing a wanted tag (0032 = study comments). Dataset
+// elements are ordered by tag, so once we see a higher group nothing we
+// want can follow — this also stops us well before PixelData (7FE0,0010).
+const MAX_WANTED_GROUP: u16 = 0x0032;
 
 // Sequence/item delimiter tags
 const ITEM_TAG: u32 = 0xFFFE_E000;
@@ -35,10 +37,12 @@ const LONG_VRS: &[&[u8; 2]] = &[
     b"OB", b"OD", b"OF", b"OL", b"OW", b"SQ", b"UC", b"UN", b"UR", b"UT",
 ];
 
+// Stored without the leading dot so they compare directly against
+// Path::extension output.
 const SKIP_EXTENSIONS: &[&str] = &[
-    ".pdf", ".txt", ".exe", ".bat", ".inf", ".chm", ".log", ".xml", ".html",
-    ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".doc", ".docx",
-    ".xls", ".xlsx", ".zip", ".rar", ".7z",
+    "pdf", "txt", "exe", "bat", "inf", "chm", "log", "xml", "html",
+    "jpg", "jpeg", "png", "gif", "bmp", "tiff", "doc", "docx",
+    "xls", "xlsx", "zip", "rar", "7z",
 ];
 
 /// Tags we care about — build a set for O(1) lookup.
@@ -54,60 +58,40 @@ fn wanted_tags() -> HashSet<u32> {
     .collect()
 }
 
-/// Quick validation: is this likely a DICOM file?
-pub fn is_valid_dicom(path: &Path) -> bool {
-    // Size check
-    let meta = match std::fs::metadata(path) {
-        Ok(m) => m,
-        Err(_) => return false,
+/// Check a file name for a plausible DICOM extension without allocating.
+/// Accepts .dcm/.ima/.dicom, no extension, or an all-digit suffix (common
+/// for numbered series exports). A leading dot is not an extension,
+/// mirroring Path::extension.
+pub fn is_candidate_name(name: &str) -> bool {
+    let base = name.rsplit(['/', '\\']).next().unwrap_or("");
+    let ext = match base.rfind('.') {
+        None | Some(0) => "",
+        Some(i) => &base[i + 1..],
     };
-    if meta.len() < 132 || meta.is_dir() {
-        return false;
-    }
+    ext.is_empty()
+        || ext.eq_ignore_ascii_case("dcm")
+        || ext.eq_ignore_ascii_case("ima")
+        || ext.eq_ignore_ascii_case("dicom")
+        || ext.bytes().all(|b| b.is_ascii_digit())
+}
 
-    // Extension skip
+/// Validate and parse a DICOM file in a single open: extension screening,
+/// the DICM-magic check, and tag extraction all run against one mmap.
+/// Returns None for anything that isn't a parseable DICOM file.
+pub fn scan_file(path: &Path) -> Option<StudyInfo> {
+    // Extension skip — case-insensitive compare, no per-file allocation
     if let Some(ext) = path.extension().and_then(|e| e.to_str()) {
-        let ext_lower = format!(".{}", ext.to_lowercase());
-        if SKIP_EXTENSIONS.contains(&ext_lower.as_str()) {
-            return false;
-        }
-    }
-
-    // mmap and check DICM magic at offset 128
-    let file = match File::open(path) {
-        Ok(f) => f,
-        Err(_) => return false,
-    };
-    let mmap = match unsafe { Mmap::map(&file) } {
-        Ok(m) => m,
-        Err(_) => return false,
-    };
-    if mmap.len() < 132 {
-        return false;
-    }
-
-    // Standard DICOM: 128-byte preamble + "DICM"
-    if &mmap[128..132] == b"DICM" {
-        return true;
-    }
-
-    // Non-standard: some files skip the preamble entirely.
-    // Check if the first bytes look like a DICOM tag (group 0008 is common).
-    if mmap.len() >= 4 {
-        let group = u16::from_le_bytes([mmap[0], mmap[1]]);
-        // Group 0008 (study/series info) or 0002 (file meta) are valid starts
-        if group == 0x0008 || group == 0x0002 {
-            return true;
+        if SKIP_EXTENSIONS.iter().any(|s| ext.eq_ignore_ascii_case(s)) {
+            return None;
         }
     }
 
-    false
-}
-
-/// Extract the 15 needed tags from a DICOM file using zero-copy mmap parsing.
-pub fn extract_tags(path: &Path) -> Option<StudyInfo> {
     let file = File::open(path).ok()?;
     let mmap = unsafe { Mmap::map(&file) }.ok()?;
+    // is_valid_dicom_bytes covers the size floor and magic/group checks
+    if !is_valid_dicom_bytes(&mmap) {
+        return None;
+    }
     let mut info = extract_tags_from_bytes(&mmap[..])?;
     info.source_path = Some(path.to_string_lossy().into_owned());
     Some(info)
@@ -146,11 +130,6 @@ pub fn extract_tags_from_bytes(data: &[u8]) -> Option<StudyInfo> {
         let element = read_u16_le(data, offset + 2)?;
         let tag = ((group as u32) << 16) | (element as u32);
 
-        // Stop at pixel data
-        if tag == PIXEL_DATA {
-            break;
-        }
-
         // Handle sequence/item delimiters
         if tag == ITEM_TAG || tag == ITEM_DELIM || tag == SEQ_DELIM {
             offset += 4;
@@ -164,6 +143,11 @@ pub fn extract_tags_from_bytes(data: &[u8]) -> Option<StudyInfo> {
             continue;
         }
 
+        // Past the last wanted group — nothing left to find, stop scanning
+        if group > MAX_WANTED_GROUP {
+            break;
+        }
+
         offset += 4; // past tag
 
         // Determine VR and length
@@ -390,26 +374,38 @@ fn skip_undefined_length(data: &[u8], mut offset: usize) -> usize {
 /// Decode DICOM value bytes to a trimmed string.
 /// Handles both ASCII and basic multi-byte (strip null padding, trim whitespace).
 fn decode_string(bytes: &[u8], _vr: &[u8; 2]) -> String {
-    // Strip trailing nulls and spaces (DICOM padding)
-    let end = bytes
-        .iter()
-        .rposition(|&b| b != 0 && b != b' ')
-        .map(|i| i + 1)
-        .unwrap_or(0);
-    let trimmed = &bytes[..end];
+    // Trim padding (nulls, spaces) and whitespace at the byte level on
+    // both ends first, so the allocation below is exact-size and there's
+    // no second trim-and-copy pass over the decoded string.
+    let is_pad = |b: u8| b == 0 || b.is_ascii_whitespace();
+    let start = match bytes.iter().position(|&b| !is_pad(b)) {
+        Some(i) => i,
+        None => return String::new(),
+    };
+    let end = bytes.iter().rposition(|&b| !is_pad(b)).map_or(start, |i| i + 1);
+    let trimmed = &bytes[start..end];
 
     // Try UTF-8 first, fall back to latin-1
     match std::str::from_utf8(trimmed) {
-        Ok(s) => s.trim().to_string(),
-        Err(_) => trimmed.iter().map(|&b| b as char).collect::<String>().trim().to_string(),
+        Ok(s) => s.to_string(),
+        Err(_) => trimmed.iter().map(|&b| b as char).collect(),
     }
 }
 
 /// Format a DICOM date (YYYYMMDD) to MM-DD-YYYY.
 fn format_dicom_date(raw: &str) -> String {
     let clean = raw.trim();
-    if clean.len() == 8 && clean.chars().all(|c| c.is_ascii_digit()) {
-        format!("{}-{}-{}", &clean[4..6], &clean[6..8], &clean[0..4])
+    if clean.len() == 8 && clean.bytes().all(|b| b.is_ascii_digit()) {
+        // Assemble by slice copies into one exact-size allocation; this
+        // runs twice per DICOM (study date + DOB) so skipping the format!
+        // machinery is worth it.
+        let mut out = String::with_capacity(10);
+        out.push_str(&clean[4..6]);
+        out.push('-');
+        out.push_str(&clean[6..8]);
+        out.push('-');
+        out.push_str(&clean[..4]);
+        out
     } else {
         "Unknown".into()
     }
@@ -453,9 +449,11 @@ fn resolve_study_description(
     series_desc: &str,
     modality: &str,
 ) -> String {
+    // Case-insensitive compare in place — this runs up to four times per
+    // DICOM, so don't build a lowercased copy per check.
     let meaningful = |s: &str| {
-        let lower = s.trim().to_lowercase();
-        !lower.is_empty() && lower != "study" && lower != "unknown"
+        let t = s.trim();
+        !t.is_empty() && !t.eq_ignore_ascii_case("study") && !t.eq_ignore_ascii_case("unknown")
     };
 
     let desc = if meaningful(study_desc) {
@@ -567,47 +565,84 @@ mod tests {
         assert_eq!(decode_string(b"", &vr), "");
     }
 
+    /// Build a short-form explicit-VR element for synthetic test buffers.
+    fn make_element(group: u16, element: u16, vr: &[u8; 2], value: &[u8]) -> Vec<u8> {
+        let mut out = Vec::new();
+        out.extend_from_slice(&group.to_le_bytes());
+        out.extend_from_slice(&element.to_le_bytes());
+        out.extend_from_slice(vr);
+        out.extend_from_slice(&(value.len() as u16).to_le_bytes());
+        out.extend_from_slice(value);
+        out
+    }
+
+    #[test]
+    fn test_extract_stops_past_wanted_groups() {
+        let mut data = vec![0u8; 128];
+        data.extend_from_slice(b"DICM");
+        data.extend(make_element(0x0010, 0x0010, b"PN", b"DOE^JOHN"));
+        // Malformed element in a higher group — the scanner should have
+        // stopped before reaching it, so extraction still succeeds.
+        data.extend_from_slice(&[0x40, 0x00, 0x10, 0x00, 0xFF, 0xFF, 0xFF, 0xFF]);
+        let info = extract_tags_from_bytes(&data).unwrap();
+        assert_eq!(info.patient_name, "Doe John");
+    }
+
+    #[test]
+    fn test_is_candidate_name() {
+        assert!(is_candidate_name("image.dcm"));
+        assert!(is_candidate_name("IMAGE.DCM"));
+        assert!(is_candidate_name("scan.IMA"));
+        assert!(is_candidate_name("series/IM000001"));
+        assert!(is_candidate_name("export.0001"));
+        assert!(is_candidate_name("noextension"));
+        assert!(!is_candidate_name("report.pdf"));
+        assert!(!is_candidate_name("archive.zip"));
+        assert!(!is_candidate_name("dir\\notes.txt"));
+    }
+
     #[test]
-    fn test_is_valid_dicom_rejects_small_files() {
+    fn test_scan_file_rejects_small_files() {
         let dir = tempfile::tempdir().unwrap();
         let path = dir.path().join("small.dcm");
         std::fs::write(&path, b"too small").unwrap();
-        assert!(!is_valid_dicom(&path));
+        assert!(scan_file(&path).is_none());
     }
 
     #[test]
-    fn test_is_valid_dicom_accepts_magic() {
+    fn test_scan_file_parses_valid_dicom() {
         let dir = tempfile::tempdir().unwrap();
         let path = dir.path().join("test.dcm");
-        let mut data = vec![0u8; 256];
-        // Write DICM at offset 128
-        data[128] = b'D';
-        data[129] = b'I';
-        data[130] = b'C';
-        data[131] = b'M';
+        let mut data = vec![0u8; 128];
+        data.extend_from_slice(b"DICM");
+        data.extend(make_element(0x0010, 0x0010, b"PN", b"DOE^JOHN"));
         std::fs::write(&path, &data).unwrap();
-        assert!(is_valid_dicom(&path));
+        let info = scan_file(&path).unwrap();
+        assert_eq!(info.patient_name, "Doe John");
+        assert!(info.source_path.unwrap().ends_with("test.dcm"));
     }
 
     #[test]
-    fn test_is_valid_dicom_accepts_no_preamble() {
+    fn test_scan_file_accepts_no_preamble() {
         let dir = tempfile::tempdir().unwrap();
         let path = dir.path().join("nopreamble.dcm");
-        // Group 0008 at start (no preamble)
-        let mut data = vec![0u8; 256];
-        data[0] = 0x08;
-        data[1] = 0x00;
+        // Group 0008 element at start (no preamble); pad past the size floor
+        let mut data = make_element(0x0008, 0x0020, b"DA", b"20260315");
+        data.extend(make_element(0x0010, 0x0010, b"PN", b"DOE^JOHN"));
+        data.resize(256, 0);
         std::fs::write(&path, &data).unwrap();
-        assert!(is_valid_dicom(&path));
+        let info = scan_file(&path).unwrap();
+        assert_eq!(info.study_date, "03-15-2026");
     }
 
     #[test]
-    fn test_is_valid_dicom_skips_extensions() {
+    fn test_scan_file_skips_extensions() {
         let dir = tempfile::tempdir().unwrap();
         let path = dir.path().join("test.pdf");
-        let mut data = vec![0u8; 256];
-        data[128..132].copy_from_slice(b"DICM");
+        let mut data = vec![0u8; 128];
+        data.extend_from_slice(b"DICM");
+        data.extend(make_element(0x0010, 0x0010, b"PN", b"DOE^JOHN"));
         std::fs::write(&path, &data).unwrap();
-        assert!(!is_valid_dicom(&path));
+        assert!(scan_file(&path).is_none());
     }
 }
@@ -93,7 +93,7 @@ fn main() {
 
     if all_studies.is_empty() {
         progress::error("No DICOM studies found");
-        std::process::exit(1);
+        exit_after_cleanup(1);
     }
 
     progress::progress(95, "Merging patient records...");
@@ -101,7 +101,7 @@ fn main() {
 
     if patients.is_empty() {
         progress::error("No patients with identifiable information found");
-        std::process::exit(1);
+        exit_after_cleanup(1);
     }
 
     let elapsed = start.elapsed();
@@ -115,6 +115,9 @@ fn main() {
         patients,
     };
 
+    // Make sure background temp-dir deletions have finished before exit
+    zip_handler::finish_cleanup();
+
     progress::progress(100, "Done");
 
     // Write JSON to stdout
@@ -124,6 +127,14 @@ fn main() {
     }
 }
 
+/// Exit, but only after background temp-dir deletions have finished —
+/// process::exit would kill them mid-removal and leave extracted patient
+/// files behind.
+fn exit_after_cleanup(code: i32) -> ! {
+    zip_handler::finish_cleanup();
+    std::process::exit(code);
+}
+
 fn has_zip_extension(path: &Path) -> bool {
     path.extension()
         .and_then(|e| e.to_str())
@@ -150,7 +161,9 @@ fn process_single_zip(
     }
 
     progress::progress(0, format!("Processing ZIP: {}", zip_path.display()));
-    let studies = zip_handler::process_zip(zip_path, password, seven_zip, 0, max_nested);
+    // Reuse the encryption probe done above instead of re-parsing the
+    // central directory inside process_zip.
+    let studies = zip_handler::process_zip(zip_path, password, seven_zip, 0, max_nested, Some(enc));
     let valid = studies.len() as u64;
     // files_scanned is approximate for ZIPs — we count valid as scanned
     files_scanned.fetch_add(valid, Ordering::Relaxed);
@@ -174,19 +187,23 @@ fn process_directory(
     let mut scan_count: u64 = 0;
 
     for entry in jwalk::WalkDir::new(dir_path)
+        // Prune hidden files/directories when each directory is read, so
+        // hidden subtrees are never descended into and produced paths don't
+        // need a per-file component scan.
+        .process_read_dir(|_depth, _path, _state, children| {
+            children.retain(|child| {
+                child
+                    .as_ref()
+                    .map(|e| !e.file_name().to_string_lossy().starts_with('.'))
+                    .unwrap_or(true)
+            });
+        })
         .into_iter()
         .filter_map(|e| e.ok())
     {
-        let path = entry.path();
-        if !path.is_file() {
-            continue;
-        }
-
-        // Skip hidden directories/files
-        if path
-            .components()
-            .any(|c| c.as_os_str().to_string_lossy().starts_with('.'))
-        {
+        // The file type comes from the directory read itself — checking it
+        // here avoids a stat syscall per entry (path.is_file() re-stats).
+        if !entry.file_type().is_file() {
             continue;
         }
 
@@ -198,26 +215,13 @@ fn process_directory(
             );
         }
 
-        let name_lower = path
-            .file_name()
-            .unwrap_or_default()
-            .to_string_lossy()
-            .to_lowercase();
-
-        if name_lower.ends_with(".zip") {
-            zip_files.push(path.to_path_buf());
-        } else {
-            // Check if it could be a DICOM file
-            let ext = path
-                .extension()
-                .and_then(|e| e.to_str())
-                .unwrap_or("")
-                .to_lowercase();
-            let is_candidate = matches!(ext.as_str(), "dcm" | "ima" | "dicom" | "")
-                || ext.chars().all(|c| c.is_ascii_digit());
-            if is_candidate {
-                dicom_candidates.push(path.to_path_buf());
-            }
+        // Classify on the entry name first; only matched entries pay for
+        // building the full PathBuf.
+        let file_name = entry.file_name().to_string_lossy();
+        if zip_handler::is_zip_name(&file_name) {
+            zip_files.push(entry.path());
+        } else if dicom::is_candidate_name(&file_name) {
+            dicom_candidates.push(entry.path());
         }
     }
 
@@ -233,10 +237,15 @@ fn process_directory(
 
     let mut all_studies: Vec<types::StudyInfo> = Vec::new();
 
-    // Check if any ZIPs need a password
+    // Check if any ZIPs need a password. The probes each open a central
+    // directory (pure I/O latency), so run them in parallel and keep the
+    // per-archive results for the processing loop below.
     if !zip_files.is_empty() {
-        let any_encrypted = zip_files.iter().any(|z| {
-            let enc = zip_handler::detect_encryption(z);
+        let encryption_types: Vec<zip_handler::EncryptionType> = zip_files
+            .par_iter()
+            .map(|z| zip_handler::detect_encryption(z))
+            .collect();
+        let any_encrypted = encryption_types.iter().any(|&enc| {
             enc != zip_handler::EncryptionType::None
                 && enc != zip_handler::EncryptionType::Corrupted
         });
@@ -245,24 +254,38 @@ fn process_directory(
             std::process::exit(2);
         }
 
-        // Process ZIPs sequentially
-        for (i, zip_path) in zip_files.iter().enumerate() {
-            let pct = 10 + ((i as i32 * 45) / zip_files.len().max(1) as i32);
-            progress::progress(
-                pct,
-                format!(
-                    "Processing ZIP {}/{}: {}",
-                    i + 1,
-                    zip_files.len(),
-                    zip_path.file_name().unwrap_or_default().to_string_lossy()
-                ),
-            );
-            let studies =
-                zip_handler::process_zip(zip_path, password, seven_zip, 0, max_nested);
-            let count = studies.len() as u64;
-            dicom_valid.fetch_add(count, Ordering::Relaxed);
-            all_studies.extend(studies);
-        }
+        // Process ZIPs in parallel — archives are independent, so
+        // decompression of one can overlap parsing of another. Progress is
+        // driven by a completion counter since finish order is arbitrary.
+        let zips_done = AtomicU64::new(0);
+        let total_zips = zip_files.len();
+        let zip_studies: Vec<types::StudyInfo> = zip_files
+            .par_iter()
+            .enumerate()
+            .flat_map(|(i, zip_path)| {
+                let done = zips_done.fetch_add(1, Ordering::Relaxed);
+                let pct = 10 + ((done as i32 * 45) / total_zips.max(1) as i32);
+                progress::progress(
+                    pct,
+                    format!(
+                        "Processing ZIP {}/{}: {}",
+                        done + 1,
+                        total_zips,
+                        zip_path.file_name().unwrap_or_default().to_string_lossy()
+                    ),
+                );
+                zip_handler::process_zip(
+                    zip_path,
+                    password,
+                    seven_zip,
+                    0,
+                    max_nested,
+                    Some(encryption_types[i]),
+                )
+            })
+            .collect();
+        dicom_valid.fetch_add(zip_studies.len() as u64, Ordering::Relaxed);
+        all_studies.extend(zip_studies);
     }
 
     // Process loose DICOM files in parallel
@@ -277,6 +300,9 @@ fn process_directory(
 
     let dicom_studies: Vec<types::StudyInfo> = dicom_candidates
         .par_iter()
+        // Individual files are cheap to parse; batching them keeps rayon's
+        // per-task scheduling overhead off the hot path (map chunksize).
+        .with_min_len(32)
         .filter_map(|path| {
             let count = processed_count.fetch_add(1, Ordering::Relaxed);
             if count % 100 == 0 && total_candidates > 0 {
@@ -290,13 +316,8 @@ fn process_directory(
                 );
             }
 
-            if !dicom::is_valid_dicom(path) {
-                return None;
-            }
-            dicom::extract_tags(path).map(|mut info| {
-                info.source_path = Some(path.to_string_lossy().into_owned());
-                info
-            })
+            // Validation and extraction share a single open + mmap
+            dicom::scan_file(path)
         })
         .collect();
 
@@ -1,18 +1,28 @@
 use crate::types::{Patient, Study, StudyInfo};
-use std::collections::BTreeMap;
+use std::collections::hash_map::DefaultHasher;
+use std::collections::{BTreeMap, HashMap};
+use std::hash::{Hash, Hasher};
 
 /// Normalize a patient name for matching: uppercase, sort parts alphabetically.
 /// Returns None if the name is empty or "Unknown".
 pub fn normalize_name(name: &str) -> Option<Vec<String>> {
-    let cleaned = name
-        .replace('^', " ")
-        .replace(',', " ")
-        .replace('_', " ");
-    let mut parts: Vec<String> = cleaned
-        .split_whitespace()
-        .map(|s| s.to_uppercase())
-        .filter(|s| !s.is_empty())
-        .collect();
+    // Single pass: separators and whitespace split, everything else is
+    // uppercased in place. Avoids the three intermediate full-string
+    // allocations the old replace() chain produced per call.
+    let mut parts: Vec<String> = Vec::new();
+    let mut current = String::new();
+    for ch in name.chars() {
+        if ch == '^' || ch == ',' || ch == '_' || ch.is_whitespace() {
+            if !current.is_empty() {
+                parts.push(std::mem::take(&mut current));
+            }
+        } else {
+            current.extend(ch.to_uppercase());
+        }
+    }
+    if !current.is_empty() {
+        parts.push(current);
+    }
     if parts.is_empty() || (parts.len() == 1 && parts[0] == "UNKNOWN") {
         return None;
     }
@@ -20,21 +30,13 @@ pub fn normalize_name(name: &str) -> Option<Vec<String>> {
     Some(parts)
 }
 
-/// Check if two names match after normalization.
-pub fn names_match(a: &str, b: &str) -> bool {
-    match (normalize_name(a), normalize_name(b)) {
-        (Some(na), Some(nb)) => na == nb,
-        _ => false,
-    }
-}
-
-/// Check if a patient has all unknown/empty identifying information.
-fn is_all_unknown(patient: &Patient) -> bool {
-    let id_unknown = patient.patient_id.as_ref().map_or(true, |id| id.trim().is_empty());
-    let name_unknown = patient.patient_name.trim().is_empty()
-        || patient.patient_name.trim() == "Unknown";
-    let dob_unknown = patient.patient_dob.trim().is_empty()
-        || patient.patient_dob.trim() == "Unknown";
+/// Check if a study carries no identifying information at all.
+fn is_all_unknown(study: &StudyInfo) -> bool {
+    let id_unknown = study.patient_id.as_ref().map_or(true, |id| id.trim().is_empty());
+    let name_unknown = study.patient_name.trim().is_empty()
+        || study.patient_name.trim() == "Unknown";
+    let dob_unknown = study.patient_dob.trim().is_empty()
+        || study.patient_dob.trim() == "Unknown";
     id_unknown && name_unknown && dob_unknown
 }
 
@@ -42,27 +44,36 @@ fn is_all_unknown(patient: &Patient) -> bool {
 /// Matches by patient ID first, then by normalized name with DOB conflict detection.
 pub fn merge_patients(studies: Vec<StudyInfo>) -> BTreeMap<String, Patient> {
     let mut patients: Vec<(String, Patient)> = Vec::new();
+    // Index patients by ID and by normalized name so each incoming study
+    // does O(1) lookups instead of scanning every merged patient. The
+    // name buckets hold insertion-ordered indexes, preserving the old
+    // first-match semantics for the DOB-conflict check.
+    let mut by_id: HashMap<String, usize> = HashMap::new();
+    let mut by_name: HashMap<Vec<String>, Vec<usize>> = HashMap::new();
 
-    for study in &studies {
+    // Each study is consumed by value: its strings are moved into the
+    // patient record that absorbs it rather than cloned field by field.
+    for mut study in studies {
+        // All-unknown studies can never match by ID or name and would only
+        // be dropped by a filter pass afterwards — skip them up front so the
+        // output doesn't need a second scan over every merged patient.
+        if is_all_unknown(&study) {
+            continue;
+        }
+
+        let norm_name = normalize_name(&study.patient_name);
         let mut matched_idx: Option<usize> = None;
 
         // Phase 1: match by patient ID
-        if let Some(ref pid) = study.patient_id {
-            if !pid.is_empty() {
-                for (i, (_, p)) in patients.iter().enumerate() {
-                    if p.patient_id.as_deref() == Some(pid.as_str()) {
-                        matched_idx = Some(i);
-                        break;
-                    }
-                }
-            }
+        if let Some(pid) = study.patient_id.as_ref().filter(|p| !p.is_empty()) {
+            matched_idx = by_id.get(pid.as_str()).copied();
         }
 
         // Phase 2: match by normalized name (skip if DOB conflict)
         if matched_idx.is_none() {
-            for (i, (_, p)) in patients.iter().enumerate() {
-                if names_match(&study.patient_name, &p.patient_name) {
-                    // Check DOB conflict
+            if let Some(bucket) = norm_name.as_ref().and_then(|n| by_name.get(n)) {
+                for &i in bucket {
+                    let p = &patients[i].1;
                     if study.patient_dob != "Unknown"
                         && p.patient_dob != "Unknown"
                         && study.patient_dob != p.patient_dob
@@ -80,18 +91,18 @@ pub fn merge_patients(studies: Vec<StudyInfo>) -> BTreeMap<String, Patient> {
 
             // Update DOB if existing is Unknown
             if existing.patient_dob == "Unknown" && study.patient_dob != "Unknown" {
-                existing.patient_dob = study.patient_dob.clone();
+                existing.patient_dob = std::mem::take(&mut study.patient_dob);
             }
 
             // Update facility info if not set
             if existing.institution_name.is_none() {
-                existing.institution_name = study.institution_name.clone();
+                existing.institution_name = study.institution_name.take();
             }
             if existing.institution_address.is_none() {
-                existing.institution_address = study.institution_address.clone();
+                existing.institution_address = study.institution_address.take();
             }
             if existing.department_name.is_none() {
-                existing.department_name = study.department_name.clone();
+                existing.department_name = study.department_name.take();
             }
 
             // Add study/series
@@ -104,13 +115,22 @@ pub fn merge_patients(studies: Vec<StudyInfo>) -> BTreeMap<String, Patient> {
                 study.patient_dob,
                 study.patient_id.as_deref().unwrap_or("NO_ID")
             );
+
+            let idx = patients.len();
+            if let Some(pid) = study.patient_id.as_ref().filter(|p| !p.is_empty()) {
+                by_id.entry(pid.clone()).or_insert(idx);
+            }
+            if let Some(norm) = norm_name {
+                by_name.entry(norm).or_default().push(idx);
+            }
+
             let mut patient = Patient {
-                patient_id: study.patient_id.clone(),
-                patient_name: study.patient_name.clone(),
-                patient_dob: study.patient_dob.clone(),
-                institution_name: study.institution_name.clone(),
-                institution_address: study.institution_address.clone(),
-                department_name: study.department_name.clone(),
+                patient_id: study.patient_id.take(),
+                patient_name: std::mem::take(&mut study.patient_name),
+                patient_dob: std::mem::take(&mut study.patient_dob),
+                institution_name: study.institution_name.take(),
+                institution_address: study.institution_address.take(),
+                department_name: study.department_name.take(),
                 studies: BTreeMap::new(),
             };
             add_study_to_patient(&mut patient, study);
@@ -118,33 +138,40 @@ pub fn merge_patients(studies: Vec<StudyInfo>) -> BTreeMap<String, Patient> {
         }
     }
 
-    // Filter out all-unknown patients
-    patients
-        .into_iter()
-        .filter(|(_, p)| !is_all_unknown(p))
-        .collect()
+    patients.into_iter().collect()
 }
 
-fn add_study_to_patient(patient: &mut Patient, study: &StudyInfo) {
-    let study_uid = study
-        .study_instance_uid
-        .clone()
-        .unwrap_or_else(|| format!("{}_{}", study.study_date, study.study_description));
+fn add_study_to_patient(patient: &mut Patient, study: StudyInfo) {
+    let StudyInfo {
+        study_instance_uid,
+        study_date,
+        study_description,
+        series_instance_uid,
+        series_number,
+        series_description,
+        ..
+    } = study;
+
+    let study_uid = study_instance_uid
+        .unwrap_or_else(|| format!("{}_{}", study_date, study_description));
 
     let entry = patient.studies.entry(study_uid).or_insert_with(|| Study {
-        study_date: study.study_date.clone(),
-        study_description: study.study_description.clone(),
-        all_series: std::collections::BTreeSet::new(),
+        study_date,
+        study_description,
+        all_series: std::collections::HashSet::new(),
     });
 
-    let series_uid = study.series_instance_uid.clone().unwrap_or_else(|| {
-        format!(
-            "{}_{}",
-            study.series_number.as_deref().unwrap_or("Unknown"),
-            study.series_description
-        )
-    });
-    entry.all_series.insert(series_uid);
+    // Store a 64-bit hash of the series identity rather than the UID
+    // string itself — the set exists only to count distinct series.
+    let mut hasher = DefaultHasher::new();
+    match series_instance_uid {
+        Some(uid) => uid.hash(&mut hasher),
+        None => {
+            series_number.as_deref().unwrap_or("Unknown").hash(&mut hasher);
+            series_description.hash(&mut hasher);
+        }
+    }
+    entry.all_series.insert(hasher.finish());
 }
 
 #[cfg(test)]
@@ -161,11 +188,11 @@ mod tests {
     }
 
     #[test]
-    fn test_names_match() {
-        assert!(names_match("DOE^JOHN", "John Doe"));
-        assert!(names_match("SMITH, JANE", "jane_smith"));
-        assert!(!names_match("DOE^JOHN", "SMITH^JANE"));
-        assert!(!names_match("Unknown", "DOE^JOHN"));
+    fn test_normalized_names_match() {
+        assert_eq!(normalize_name("DOE^JOHN"), normalize_name("John Doe"));
+        assert_eq!(normalize_name("SMITH, JANE"), normalize_name("jane_smith"));
+        assert_ne!(normalize_name("DOE^JOHN"), normalize_name("SMITH^JANE"));
+        assert_ne!(normalize_name("Unknown"), normalize_name("DOE^JOHN"));
     }
 
     #[test]
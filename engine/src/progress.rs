@@ -1,9 +1,19 @@
 use serde::Serialize;
 use std::io::Write;
-use std::sync::Mutex;
+use std::sync::atomic::{AtomicI32, AtomicU64, Ordering};
+use std::sync::{Mutex, OnceLock};
+use std::time::Instant;
 
 static STDERR_LOCK: Mutex<()> = Mutex::new(());
 
+// Progress throttle state. Every emitted line is an event the GUI has to
+// marshal onto its event loop, so repeated updates at the same percentage
+// are rate-limited; a change in percentage always goes through.
+static START: OnceLock<Instant> = OnceLock::new();
+static LAST_EMIT_MS: AtomicU64 = AtomicU64::new(0);
+static LAST_PERCENT: AtomicI32 = AtomicI32::new(i32::MIN);
+const MIN_INTERVAL_MS: u64 = 50;
+
 #[derive(Debug, Serialize)]
 #[serde(tag = "type", rename_all = "snake_case")]
 pub enum ProgressMessage {
@@ -27,6 +37,15 @@ pub fn emit(msg: &ProgressMessage) {
 }
 
 pub fn progress(percent: i32, message: impl Into<String>) {
+    let now_ms = START.get_or_init(Instant::now).elapsed().as_millis() as u64;
+    if percent == LAST_PERCENT.load(Ordering::Relaxed) {
+        let last = LAST_EMIT_MS.load(Ordering::Relaxed);
+        if now_ms.saturating_sub(last) < MIN_INTERVAL_MS {
+            return;
+        }
+    }
+    LAST_PERCENT.store(percent, Ordering::Relaxed);
+    LAST_EMIT_MS.store(now_ms, Ordering::Relaxed);
     emit(&ProgressMessage::Progress {
         percent,
         message: message.into(),
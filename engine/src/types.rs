@@ -1,5 +1,5 @@
 use serde::Serialize;
-use std::collections::{BTreeMap, BTreeSet};
+use std::collections::{BTreeMap, HashSet};
 
 /// Raw per-file extraction result from DICOM parsing.
 #[derive(Debug, Clone)]
@@ -25,7 +25,18 @@ pub struct StudyInfo {
 pub struct Study {
     pub study_date: String,
     pub study_description: String,
-    pub all_series: BTreeSet<String>,
+    /// 64-bit hashes of series UIDs, kept as a set for dedup during
+    /// merging. Only the count is consumed downstream, so the full UID
+    /// strings are never stored and it serializes as `series_count`.
+    #[serde(rename = "series_count", serialize_with = "serialize_set_len")]
+    pub all_series: HashSet<u64>,
+}
+
+fn serialize_set_len<S: serde::Serializer>(
+    set: &HashSet<u64>,
+    serializer: S,
+) -> Result<S::Ok, S::Error> {
+    serializer.serialize_u64(set.len() as u64)
 }
 
 /// A merged patient record.
@@ -6,8 +6,56 @@ use std::fs::File;
 use std::io::Read;
 use std::path::{Path, PathBuf};
 use std::process::Command;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::collections::HashMap;
+use std::sync::{Mutex, OnceLock};
+
+/// Background temp-dir deletions in flight (see process_zip_disk_fallback).
+static CLEANUP_THREADS: Mutex<Vec<std::thread::JoinHandle<()>>> = Mutex::new(Vec::new());
+
+/// Parse results keyed by (CRC32, size) from the central directory.
+/// DICOM deliveries frequently contain the same slices re-zipped into
+/// several archives; on a key hit the cached result is reused instead of
+/// decompressing and parsing the member again. `None` records members
+/// that were read but turned out not to be DICOM.
+static PARSE_CACHE: OnceLock<Mutex<HashMap<(u32, u64), Option<StudyInfo>>>> = OnceLock::new();
+
+fn parse_cache() -> &'static Mutex<HashMap<(u32, u64), Option<StudyInfo>>> {
+    PARSE_CACHE.get_or_init(|| Mutex::new(HashMap::new()))
+}
+
+/// Look up a member's cached parse result; clones the study with the
+/// given source label on a hit. Returns None when the key is unseen.
+fn cached_parse(key: (u32, u64), source_label: &str) -> Option<Option<StudyInfo>> {
+    let cache = parse_cache().lock().unwrap_or_else(|e| e.into_inner());
+    cache.get(&key).map(|cached| {
+        cached.as_ref().map(|info| {
+            let mut info = info.clone();
+            info.source_path = Some(source_label.to_string());
+            info
+        })
+    })
+}
+
+fn store_parse(key: (u32, u64), parsed: &Option<StudyInfo>) {
+    parse_cache()
+        .lock()
+        .unwrap_or_else(|e| e.into_inner())
+        .insert(key, parsed.clone());
+}
+
+/// Wait for background temp-dir deletions to finish. Called once before the
+/// process exits so extracted patient files never outlive the run.
+pub fn finish_cleanup() {
+    let handles = std::mem::take(
+        &mut *CLEANUP_THREADS.lock().unwrap_or_else(|e| e.into_inner()),
+    );
+    for handle in handles {
+        let _ = handle.join();
+    }
+}
 
-#[derive(Debug, PartialEq)]
+#[derive(Debug, PartialEq, Clone, Copy)]
 pub enum EncryptionType {
     None,
     Traditional,
@@ -60,22 +108,29 @@ pub fn find_7zip() -> Option<PathBuf> {
 }
 
 fn which_7z() -> Option<PathBuf> {
-    for name in &["7z", "7za"] {
-        if let Ok(output) = Command::new("where").arg(name).output() {
-            if output.status.success() {
-                let stdout = String::from_utf8_lossy(&output.stdout);
-                if let Some(line) = stdout.lines().next() {
-                    let p = PathBuf::from(line.trim());
-                    if p.is_file() {
-                        return Some(p);
-                    }
-                }
+    // Walk PATH directly instead of spawning `where` per candidate name —
+    // an existence check is all we need, and process launches are slow
+    // enough on Windows to show up in startup time.
+    let path_var = std::env::var_os("PATH")?;
+    for dir in std::env::split_paths(&path_var) {
+        for name in &["7z.exe", "7za.exe", "7z", "7za"] {
+            let candidate = dir.join(name);
+            if candidate.is_file() {
+                return Some(candidate);
             }
         }
     }
     None
 }
 
+/// Case-insensitive ".zip" suffix check without allocating a lowercase copy.
+pub fn is_zip_name(name: &str) -> bool {
+    name.len() >= 4
+        && name
+            .get(name.len() - 4..)
+            .map_or(false, |s| s.eq_ignore_ascii_case(".zip"))
+}
+
 /// Extract a ZIP file using 7-Zip subprocess to a temp directory.
 fn extract_with_7zip(
     seven_zip: &Path,
@@ -127,38 +182,57 @@ struct MemEntry {
     data: Vec<u8>,
 }
 
-/// Stream a ZIP archive, parsing DICOM entries on-the-fly without buffering
-/// all file contents in memory. Only nested ZIPs are buffered (they're typically small).
-/// Returns parsed StudyInfo results or Err for password/corruption issues.
-fn stream_and_parse_zip(
-    zip_path: &Path,
-    password: Option<&[u8]>,
-    source_label: &str,
-    seven_zip: Option<&Path>,
-    nested_level: u32,
-    max_nested: u32,
-) -> Result<Vec<StudyInfo>, String> {
+/// Entry count above which a single archive is split across parallel
+/// readers. Below this, per-worker central-directory parsing costs more
+/// than the decompression it saves.
+const PARALLEL_ZIP_THRESHOLD: usize = 256;
+
+/// Studies and buffered nested ZIPs produced by scanning a range of entries.
+struct ScanOutcome {
+    studies: Vec<StudyInfo>,
+    nested_zips: Vec<MemEntry>,
+}
+
+/// Open a ZIP archive with a large read buffer: entry data and local
+/// headers are read as many small sequential chunks, and the default
+/// 8 KiB buffer leaves a lot of throughput on the table on spinning
+/// disks and network shares.
+fn open_archive(zip_path: &Path) -> Result<zip::ZipArchive<std::io::BufReader<File>>, String> {
     let file = File::open(zip_path)
         .map_err(|e| format!("Cannot open ZIP {}: {}", zip_path.display(), e))?;
-    let reader = std::io::BufReader::new(file);
-    let mut archive = zip::ZipArchive::new(reader)
-        .map_err(|e| format!("Invalid ZIP: {}", e))?;
-
-    let total = archive.len();
-    let zip_name = zip_path
-        .file_name()
-        .unwrap_or_default()
-        .to_string_lossy();
+    let reader = std::io::BufReader::with_capacity(4 << 20, file);
+    zip::ZipArchive::new(reader).map_err(|e| format!("Invalid ZIP: {}", e))
+}
 
-    let mut all_studies: Vec<StudyInfo> = Vec::new();
-    let mut nested_zips: Vec<MemEntry> = Vec::new();
-    let mut dicom_count: u64 = 0;
+/// Scan a contiguous range of archive entries: decompress candidates, parse
+/// them, and buffer nested ZIPs. `entries_done` is shared across workers to
+/// drive progress. Returns Err("WRONG_PASSWORD") on a failed decrypt.
+#[allow(clippy::too_many_arguments)]
+fn scan_entry_range<R: std::io::Read + std::io::Seek>(
+    archive: &mut zip::ZipArchive<R>,
+    range: std::ops::Range<usize>,
+    password: Option<&[u8]>,
+    nested_level: u32,
+    max_nested: u32,
+    source_label: &str,
+    zip_name: &str,
+    entries_done: &AtomicU64,
+    total: usize,
+) -> Result<ScanOutcome, String> {
+    let mut out = ScanOutcome {
+        studies: Vec::new(),
+        nested_zips: Vec::new(),
+    };
 
-    for i in 0..total {
-        // Progress: 5-90% across all entries
-        if total > 0 && (i % 200 == 0 || i + 1 == total) {
-            let pct = 5 + ((i as i32 * 85) / total.max(1) as i32);
-            progress::progress(pct, format!("Processing {}: {}/{} entries", zip_name, i, total));
+    for i in range {
+        // Progress: 5-90% across all entries, by global completion count
+        let done = entries_done.fetch_add(1, Ordering::Relaxed);
+        if done % 200 == 0 || done as usize + 1 == total {
+            let pct = 5 + ((done as i32 * 85) / total.max(1) as i32);
+            progress::progress(
+                pct,
+                format!("Processing {}: {}/{} entries", zip_name, done, total),
+            );
         }
 
         let mut entry = if let Some(pw) = password {
@@ -190,61 +264,149 @@ fn stream_and_parse_zip(
             None => continue,
         };
 
-        let name_lower = name.to_lowercase();
-
-        if name_lower.ends_with(".zip") {
+        if is_zip_name(&name) {
             // Buffer nested ZIPs for later processing (typically small)
             if nested_level < max_nested {
                 let mut buf = Vec::with_capacity(entry.size() as usize);
                 if entry.read_to_end(&mut buf).is_ok() {
-                    nested_zips.push(MemEntry { name, data: buf });
+                    out.nested_zips.push(MemEntry { name, data: buf });
                 }
             }
             continue;
         }
 
         // Check if it could be DICOM by extension
-        let ext = Path::new(&name)
-            .extension()
-            .and_then(|e| e.to_str())
-            .unwrap_or("")
-            .to_lowercase();
-        let is_candidate = matches!(ext.as_str(), "dcm" | "ima" | "dicom" | "")
-            || ext.chars().all(|c| c.is_ascii_digit());
+        if !dicom::is_candidate_name(&name) {
+            continue;
+        }
 
-        if !is_candidate {
+        // Too small to hold a preamble + DICM magic — skip without decompressing
+        if entry.size() < 132 {
+            continue;
+        }
+
+        // Identical member seen before (same CRC + size)? Reuse its result.
+        // AES entries (AE-2) store CRC32 = 0 in the central directory, so a
+        // zero CRC identifies nothing — same-size encrypted members would
+        // collide and inherit each other's results. Bypass the cache then.
+        let cache_key = match entry.crc32() {
+            0 => None,
+            crc => Some((crc, entry.size())),
+        };
+        if let Some(cached) = cache_key.and_then(|key| cached_parse(key, source_label)) {
+            if let Some(info) = cached {
+                out.studies.push(info);
+            }
             continue;
         }
 
-        // Read entry into a temporary buffer, parse immediately, then drop
         let mut buf = Vec::with_capacity(entry.size() as usize);
         if entry.read_to_end(&mut buf).is_err() {
             continue;
         }
 
-        if dicom::is_valid_dicom_bytes(&buf) {
-            if let Some(mut info) = dicom::extract_tags_from_bytes(&buf) {
-                info.source_path = Some(source_label.to_string());
-                all_studies.push(info);
-                dicom_count += 1;
-            }
+        let parsed = if dicom::is_valid_dicom_bytes(&buf) {
+            dicom::extract_tags_from_bytes(&buf)
+        } else {
+            None
+        };
+        if let Some(key) = cache_key {
+            store_parse(key, &parsed);
+        }
+        if let Some(mut info) = parsed {
+            info.source_path = Some(source_label.to_string());
+            out.studies.push(info);
         }
-        // buf is dropped here — memory freed immediately
+        // buf dropped here — one entry resident per worker at a time
     }
 
-    // Process nested ZIPs
-    for nested in nested_zips {
-        let studies = process_zip_from_bytes(
-            &nested.data,
-            &nested.name,
+    Ok(out)
+}
+
+/// Stream a ZIP archive, parsing DICOM entries on-the-fly without buffering
+/// all file contents in memory. Only nested ZIPs are buffered (they're typically small).
+/// Large archives are split across parallel readers, each with its own file
+/// handle, so decompression itself scales across cores (pread-style).
+/// Returns parsed StudyInfo results or Err for password/corruption issues.
+fn stream_and_parse_zip(
+    zip_path: &Path,
+    password: Option<&[u8]>,
+    source_label: &str,
+    seven_zip: Option<&Path>,
+    nested_level: u32,
+    max_nested: u32,
+) -> Result<Vec<StudyInfo>, String> {
+    let mut archive = open_archive(zip_path)?;
+    let total = archive.len();
+    let zip_name = zip_path
+        .file_name()
+        .unwrap_or_default()
+        .to_string_lossy();
+    let entries_done = AtomicU64::new(0);
+
+    let outcomes: Vec<ScanOutcome> = if total >= PARALLEL_ZIP_THRESHOLD {
+        let workers = rayon::current_num_threads().clamp(1, 8);
+        let chunk = (total + workers - 1) / workers;
+        let ranges: Vec<std::ops::Range<usize>> = (0..workers)
+            .map(|w| (w * chunk).min(total)..((w + 1) * chunk).min(total))
+            .filter(|r| !r.is_empty())
+            .collect();
+        ranges
+            .into_par_iter()
+            .map(|range| {
+                let mut worker_archive = open_archive(zip_path)?;
+                scan_entry_range(
+                    &mut worker_archive,
+                    range,
+                    password,
+                    nested_level,
+                    max_nested,
+                    source_label,
+                    &zip_name,
+                    &entries_done,
+                    total,
+                )
+            })
+            .collect::<Result<Vec<_>, String>>()?
+    } else {
+        vec![scan_entry_range(
+            &mut archive,
+            0..total,
             password,
-            seven_zip,
-            nested_level + 1,
+            nested_level,
             max_nested,
-        );
-        all_studies.extend(studies);
+            source_label,
+            &zip_name,
+            &entries_done,
+            total,
+        )?]
+    };
+
+    let mut all_studies: Vec<StudyInfo> = Vec::new();
+    let mut nested_zips: Vec<MemEntry> = Vec::new();
+    let mut dicom_count: u64 = 0;
+    for outcome in outcomes {
+        dicom_count += outcome.studies.len() as u64;
+        all_studies.extend(outcome.studies);
+        nested_zips.extend(outcome.nested_zips);
     }
 
+    // Process nested ZIPs in parallel — each recursion owns its own buffer
+    let nested_studies: Vec<StudyInfo> = nested_zips
+        .par_iter()
+        .flat_map(|nested| {
+            process_zip_from_bytes(
+                &nested.data,
+                &nested.name,
+                password,
+                seven_zip,
+                nested_level + 1,
+                max_nested,
+            )
+        })
+        .collect();
+    all_studies.extend(nested_studies);
+
     progress::progress(92, format!("Found {} DICOM studies in {}", dicom_count, zip_name));
     Ok(all_studies)
 }
@@ -293,8 +455,7 @@ fn process_zip_from_bytes(
                     None => continue,
                 };
 
-                let entry_lower = entry_name.to_lowercase();
-                if entry_lower.ends_with(".zip") {
+                if is_zip_name(&entry_name) {
                     if nested_level < max_nested {
                         let mut buf = Vec::with_capacity(entry.size() as usize);
                         if entry.read_to_end(&mut buf).is_ok() {
@@ -304,37 +465,57 @@ fn process_zip_from_bytes(
                     continue;
                 }
 
-                let ext = Path::new(&entry_name)
-                    .extension()
-                    .and_then(|e| e.to_str())
-                    .unwrap_or("")
-                    .to_lowercase();
-                let is_candidate = matches!(ext.as_str(), "dcm" | "ima" | "dicom" | "")
-                    || ext.chars().all(|c| c.is_ascii_digit());
-                if !is_candidate {
+                if !dicom::is_candidate_name(&entry_name) {
                     continue;
                 }
 
-                let mut buf = Vec::with_capacity(entry.size() as usize);
-                if entry.read_to_end(&mut buf).is_err() {
+                // Too small to hold a preamble + DICM magic
+                if entry.size() < 132 {
                     continue;
                 }
-                if dicom::is_valid_dicom_bytes(&buf) {
-                    if let Some(mut info) = dicom::extract_tags_from_bytes(&buf) {
-                        info.source_path = Some(name.to_string());
+
+                // Zero CRC means an AES (AE-2) entry, not a real checksum —
+                // skip the cache so same-size encrypted members can't collide.
+                let cache_key = match entry.crc32() {
+                    0 => None,
+                    crc => Some((crc, entry.size())),
+                };
+                if let Some(cached) = cache_key.and_then(|key| cached_parse(key, name)) {
+                    if let Some(info) = cached {
                         all_studies.push(info);
                     }
+                    continue;
                 }
-            }
 
-            for nested in nested_zips {
-                let studies = process_zip_from_bytes(
-                    &nested.data, &nested.name, password, seven_zip,
-                    nested_level + 1, max_nested,
-                );
-                all_studies.extend(studies);
+                let mut buf = Vec::with_capacity(entry.size() as usize);
+                if entry.read_to_end(&mut buf).is_err() {
+                    continue;
+                }
+                let parsed = if dicom::is_valid_dicom_bytes(&buf) {
+                    dicom::extract_tags_from_bytes(&buf)
+                } else {
+                    None
+                };
+                if let Some(key) = cache_key {
+                    store_parse(key, &parsed);
+                }
+                if let Some(mut info) = parsed {
+                    info.source_path = Some(name.to_string());
+                    all_studies.push(info);
+                }
             }
 
+            let nested_studies: Vec<StudyInfo> = nested_zips
+                .par_iter()
+                .flat_map(|nested| {
+                    process_zip_from_bytes(
+                        &nested.data, &nested.name, password, seven_zip,
+                        nested_level + 1, max_nested,
+                    )
+                })
+                .collect();
+            all_studies.extend(nested_studies);
+
             all_studies
         }
         Err(_) => {
@@ -425,28 +606,39 @@ fn process_zip_disk_fallback(
     let mut all_studies = Vec::new();
     let source = zip_path.to_string_lossy().to_string();
 
-    // Nested ZIPs from disk
-    for nested in &nested_zips {
-        let studies = process_zip(nested, password, seven_zip, nested_level + 1, max_nested);
-        all_studies.extend(studies);
-    }
+    // Nested ZIPs from disk (parallel)
+    let nested_studies: Vec<StudyInfo> = nested_zips
+        .par_iter()
+        .flat_map(|nested| process_zip(nested, password, seven_zip, nested_level + 1, max_nested, None))
+        .collect();
+    all_studies.extend(nested_studies);
 
     // DICOM candidates from disk (parallel)
     let dicom_studies: Vec<StudyInfo> = dicom_candidates
         .par_iter()
         .filter_map(|path| {
-            if dicom::is_valid_dicom(path) {
-                dicom::extract_tags(path).map(|mut info| {
-                    info.source_path = Some(source.clone());
-                    info
-                })
-            } else {
-                None
-            }
+            let mut info = dicom::scan_file(path)?;
+            // Report the originating archive, not the temp extraction path
+            info.source_path = Some(source.clone());
+            Some(info)
         })
         .collect();
 
     all_studies.extend(dicom_studies);
+
+    // Deleting thousands of extracted files is seconds of unlink syscalls
+    // and nothing downstream waits on it — hand the tree to a background
+    // thread instead of blocking the pipeline on TempDir's drop. The
+    // handle is joined in finish_cleanup() before the process exits.
+    let cleanup_path = temp_dir.keep();
+    let handle = std::thread::spawn(move || {
+        let _ = std::fs::remove_dir_all(cleanup_path);
+    });
+    CLEANUP_THREADS
+        .lock()
+        .unwrap_or_else(|e| e.into_inner())
+        .push(handle);
+
     all_studies
 }
 
@@ -454,18 +646,21 @@ fn process_zip_disk_fallback(
 
 /// Process a ZIP file on disk. Uses in-memory streaming when possible,
 /// falls back to 7-Zip disk extraction for encrypted archives the zip crate can't handle.
+/// `known_encryption` lets callers that already probed the archive (the
+/// password pre-checks in main) skip a second central-directory parse.
 pub fn process_zip(
     zip_path: &Path,
     password: Option<&[u8]>,
     seven_zip: Option<&Path>,
     nested_level: u32,
     max_nested: u32,
+    known_encryption: Option<EncryptionType>,
 ) -> Vec<StudyInfo> {
     if nested_level > max_nested {
         return Vec::new();
     }
 
-    let enc = detect_encryption(zip_path);
+    let enc = known_encryption.unwrap_or_else(|| detect_encryption(zip_path));
     if enc == EncryptionType::Corrupted {
         progress::error(format!(
             "Corrupted ZIP: {}",
@@ -550,6 +745,92 @@ mod tests {
         assert_eq!(detect_encryption(&zip_path), EncryptionType::None);
     }
 
+    /// Minimal synthetic DICOM: preamble + DICM + explicit-VR PatientName/ID.
+    fn make_dicom(name: &str, id: &str) -> Vec<u8> {
+        let mut data = vec![0u8; 128];
+        data.extend_from_slice(b"DICM");
+        for (group, element, vr, value) in [
+            (0x0010u16, 0x0010u16, *b"PN", name.as_bytes()),
+            (0x0010, 0x0020, *b"LO", id.as_bytes()),
+        ] {
+            data.extend_from_slice(&group.to_le_bytes());
+            data.extend_from_slice(&element.to_le_bytes());
+            data.extend_from_slice(&vr);
+            data.extend_from_slice(&(value.len() as u16).to_le_bytes());
+            data.extend_from_slice(value);
+        }
+        data
+    }
+
+    #[test]
+    fn test_process_zip_parses_dicom_entries() {
+        let dir = tempfile::tempdir().unwrap();
+        let zip_path = dir.path().join("studies.zip");
+        {
+            let file = File::create(&zip_path).unwrap();
+            let mut writer = zip::ZipWriter::new(file);
+            let options = zip::write::SimpleFileOptions::default()
+                .compression_method(zip::CompressionMethod::Stored);
+            for i in 0..40 {
+                writer.start_file(format!("img{}.dcm", i), options).unwrap();
+                writer.write_all(&make_dicom("DOE^JOHN", "12345")).unwrap();
+            }
+            writer.finish().unwrap();
+        }
+        let results = process_zip(&zip_path, None, None, 0, 5, None);
+        assert_eq!(results.len(), 40);
+        assert!(results.iter().all(|s| s.patient_name == "Doe John"));
+    }
+
+    #[test]
+    fn test_process_zip_parallel_path() {
+        // Enough entries to cross PARALLEL_ZIP_THRESHOLD and exercise the
+        // split-range readers.
+        let dir = tempfile::tempdir().unwrap();
+        let zip_path = dir.path().join("big.zip");
+        let count = PARALLEL_ZIP_THRESHOLD + 44;
+        {
+            let file = File::create(&zip_path).unwrap();
+            let mut writer = zip::ZipWriter::new(file);
+            let options = zip::write::SimpleFileOptions::default()
+                .compression_method(zip::CompressionMethod::Stored);
+            for i in 0..count {
+                writer.start_file(format!("img{}.dcm", i), options).unwrap();
+                writer.write_all(&make_dicom("DOE^JOHN", "12345")).unwrap();
+            }
+            writer.finish().unwrap();
+        }
+        let results = process_zip(&zip_path, None, None, 0, 5, None);
+        assert_eq!(results.len(), count);
+    }
+
+    #[test]
+    fn test_encrypted_same_size_entries_not_conflated() {
+        // AES entries store CRC32 = 0, so the parse cache must not key on
+        // them: two distinct members with equal sizes would otherwise both
+        // hit (0, size) and one patient's result would be reused for the other.
+        let dir = tempfile::tempdir().unwrap();
+        let zip_path = dir.path().join("enc.zip");
+        {
+            let file = File::create(&zip_path).unwrap();
+            let mut writer = zip::ZipWriter::new(file);
+            let options = zip::write::SimpleFileOptions::default()
+                .compression_method(zip::CompressionMethod::Stored)
+                .with_aes_encryption(zip::AesMode::Aes256, "secret");
+            // Same-length names and IDs — identical uncompressed sizes.
+            writer.start_file("a.dcm", options).unwrap();
+            writer.write_all(&make_dicom("DOE^JOHN", "12345")).unwrap();
+            writer.start_file("b.dcm", options).unwrap();
+            writer.write_all(&make_dicom("ROE^JANE", "67890")).unwrap();
+            writer.finish().unwrap();
+        }
+        let results = process_zip(&zip_path, Some(b"secret"), None, 0, 5, None);
+        assert_eq!(results.len(), 2);
+        let mut names: Vec<&str> = results.iter().map(|s| s.patient_name.as_str()).collect();
+        names.sort();
+        assert_eq!(names, ["Doe John", "Roe Jane"]);
+    }
+
     #[test]
     fn test_process_zip_unencrypted() {
         let dir = tempfile::tempdir().unwrap();
@@ -564,7 +845,7 @@ mod tests {
             writer.finish().unwrap();
         }
         // Should succeed without crashing (no DICOM files, so empty result)
-        let results = process_zip(&zip_path, None, None, 0, 5);
+        let results = process_zip(&zip_path, None, None, 0, 5, None);
         assert!(results.is_empty());
     }
 }